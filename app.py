@@ -1,43 +1,106 @@
 # Aurora Polaris 2025. All rights reserved.
 from __future__ import annotations
 
-from datetime import datetime
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+import functools
+import itertools
+import json
 import logging
-from typing import Any, Dict, List, Sequence
+import os
+from types import MappingProxyType
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Mapping, Sequence, TypeVar
 from zoneinfo import ZoneInfo
 
 import httpx
-from dateutil import parser as date_parser
-from fastapi import FastAPI, HTTPException, Request
-from pydantic import BaseModel, Field
-from fastapi.responses import JSONResponse
+import orjson
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, Field, ValidationError
+from fastapi.responses import JSONResponse, ORJSONResponse
 from fastapi.exceptions import RequestValidationError
 
 import validate_payload as validator
 
 WEBHOOK_URL = "https://hook.eu2.make.com/e73ginw1b4moa9gypzuf8qwh4c29fo2x"
+WEBHOOK_TIMEOUT = 20
 STOCKHOLM_TZ = ZoneInfo("Europe/Stockholm")
-ASSUMED_SOURCE_TZ = ZoneInfo("UTC")
+_UTC = timezone.utc
+ASSUMED_SOURCE_TZ = _UTC
+_JSON_HEADERS = {"content-type": "application/json"}
+_DEFAULT_REQUIRED_TUPLE = tuple(validator.DEFAULT_REQUIRED_FIELDS)
+_DEFAULT_REQUIRED_SET = frozenset(_DEFAULT_REQUIRED_TUPLE)
+# Incoming payload keys renamed for the webhook.
+_ALIAS_MAP: Mapping[str, str] = MappingProxyType({"Use_name": "User_Name"})
+_WEEKDAY_NAMES = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday")
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("payload_validator")
 
-app = FastAPI(title="Payload Validator", version="1.1.0")
+# Log only every Nth /book validation failure so malformed traffic cannot flood logs.
+BOOK_VALIDATION_LOG_EVERY = max(1, int(os.environ.get("BOOK_VALIDATION_LOG_EVERY", "1")))
+_book_validation_failures = itertools.count()
+
+
+def _dump_json(value: Any) -> bytes:
+    """Serialize ``value`` with orjson, falling back to stdlib json for what it rejects.
+
+    orjson refuses integers wider than 64 bits, which are still valid JSON.
+    """
+    try:
+        return orjson.dumps(value)
+    except orjson.JSONEncodeError:
+        return json.dumps(value).encode("utf-8")
+
+
+class _ORJSONResponse(ORJSONResponse):
+    """``ORJSONResponse`` that renders with stdlib json when orjson cannot."""
+
+    def render(self, content: Any) -> bytes:
+        try:
+            return super().render(content)
+        except orjson.JSONEncodeError:
+            return JSONResponse.render(self, content)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    async with httpx.AsyncClient(
+        timeout=WEBHOOK_TIMEOUT,
+        http2=True,
+        limits=httpx.Limits(max_connections=200, max_keepalive_connections=100),
+    ) as client:
+        app.state.http = client
+        yield
+
+
+def get_webhook_client(request: Request) -> httpx.AsyncClient:
+    """Return the shared webhook client created by :func:`lifespan`."""
+    return request.app.state.http
+
+
+app = FastAPI(
+    title="Payload Validator",
+    version="1.1.0",
+    lifespan=lifespan,
+    default_response_class=_ORJSONResponse,
+)
 
 
 @app.exception_handler(RequestValidationError)
 async def request_validation_exception_handler(request: Request, exc: RequestValidationError):
-    if request.url.path == "/book":
+    if (
+        request.url.path == "/book"
+        and logger.isEnabledFor(logging.WARNING)
+        and next(_book_validation_failures) % BOOK_VALIDATION_LOG_EVERY == 0
+    ):
         try:
             raw_body = await request.body()
         except Exception:  # pragma: no cover
             raw_body = b""
-        try:
-            body_text = raw_body.decode("utf-8")
-        except UnicodeDecodeError:
-            body_text = raw_body.decode("utf-8", errors="replace")
+        body_text = raw_body.decode("utf-8", errors="replace")
         logger.warning("Validation failure on /book: errors=%s body=%s", exc.errors(), body_text)
-    return JSONResponse(status_code=422, content={"detail": exc.errors()})
+    return _ORJSONResponse(status_code=422, content={"detail": jsonable_encoder(exc.errors())})
 
 
 class ValidationRequest(BaseModel):
@@ -85,41 +148,127 @@ class BookResponse(BaseModel):
     webhook_response: Any
 
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def _json_body(model: type[ModelT]) -> Callable[[Request], Awaitable[ModelT]]:
+    """Build a dependency that validates the raw JSON body straight into ``model``.
+
+    ``model_validate_json`` parses the bytes inside pydantic-core, skipping the
+    intermediate ``json.loads`` dict FastAPI would otherwise build.
+    """
+
+    async def dependency(request: Request) -> ModelT:
+        body = await request.body()
+        if not body:
+            raise RequestValidationError(
+                [{"type": "missing", "loc": ("body",), "msg": "Field required", "input": None}]
+            )
+        try:
+            return model.model_validate_json(body)
+        except ValidationError as exc:
+            raise _request_validation_error(model, body) from exc
+
+    return dependency
+
+
+def _request_validation_error(model: type[BaseModel], body: bytes) -> Exception:
+    """Rebuild the error FastAPI itself raises for a ``body`` that failed validation.
+
+    Only runs on the failure path: the body is decoded with stdlib json and
+    validated in python mode so the 422 detail matches FastAPI's own.
+    """
+    try:
+        data = json.loads(body)
+    except json.JSONDecodeError as exc:
+        return RequestValidationError(
+            [
+                {
+                    "type": "json_invalid",
+                    "loc": ("body", exc.pos),
+                    "msg": "JSON decode error",
+                    "input": {},
+                    "ctx": {"error": exc.msg},
+                }
+            ]
+        )
+    except ValueError:
+        # Undecodable bytes; FastAPI answers these with a plain 400.
+        return HTTPException(status_code=400, detail="There was an error parsing the body")
+
+    try:
+        model.model_validate(data, from_attributes=True)
+    except ValidationError as exc:
+        errors = exc.errors(include_url=False)
+    else:  # pragma: no cover - pydantic's JSON mode rejected what stdlib json accepts (e.g. NaN)
+        errors = [{"type": "json_invalid", "loc": (), "msg": "JSON decode error", "input": {}}]
+    return RequestValidationError([{**error, "loc": ("body", *error["loc"])} for error in errors])
+
+
+def _json_body_openapi(model: type[BaseModel]) -> dict[str, Any]:
+    schema = model.model_json_schema()
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
+
+
+_validation_request_body = _json_body(ValidationRequest)
+_book_request_body = _json_body(BookRequest)
+
+
 @app.get("/")
 async def root() -> dict[str, str]:
     return {"message": "POST JSON to /validate or /book to verify required fields."}
 
 
-@app.post("/validate", response_model=ValidationResponse)
-async def validate(request: ValidationRequest) -> ValidationResponse:
-    required = _build_required_fields(
+@app.post(
+    "/validate",
+    responses={200: {"model": ValidationResponse}},
+    openapi_extra=_json_body_openapi(ValidationRequest),
+)
+async def validate(request: ValidationRequest = Depends(_validation_request_body)) -> _ORJSONResponse:
+    required, required_set = _build_required_fields(
         request.required_fields,
         request.include_defaults,
     )
     if not required:
         raise HTTPException(status_code=400, detail="No required fields specified.")
 
-    missing, empty, extras = validator.validate_payload(
+    missing, empty, extras = validator.validate_payload_fast(
         request.payload,
         required,
+        required_set,
         request.allow_empty,
     )
-    return ValidationResponse(
-        valid=not missing and not empty,
-        missing=missing,
-        empty=empty,
-        extras=extras,
+    return _ORJSONResponse(
+        content={
+            "valid": not missing and not empty,
+            "missing": missing,
+            "empty": empty,
+            "extras": extras,
+        }
     )
 
 
-@app.post("/book", response_model=BookResponse)
-async def book_appointment(request: BookRequest) -> BookResponse:
-    payload = request.model_dump(exclude_none=True)
+@app.post(
+    "/book",
+    responses={200: {"model": BookResponse}},
+    openapi_extra=_json_body_openapi(BookRequest),
+)
+async def book_appointment(
+    request: BookRequest = Depends(_book_request_body),
+    http: httpx.AsyncClient = Depends(get_webhook_client),
+) -> _ORJSONResponse:
+    payload = _book_request_payload(request)
     logger.info("Validated /book request payload: %s", payload)
 
-    missing, empty, _ = validator.validate_payload(
+    missing, empty, _ = validator.validate_payload_fast(
         payload,
-        validator.DEFAULT_REQUIRED_FIELDS,
+        _DEFAULT_REQUIRED_TUPLE,
+        _DEFAULT_REQUIRED_SET,
         allow_empty=False,
     )
     if missing or empty:
@@ -131,19 +280,23 @@ async def book_appointment(request: BookRequest) -> BookResponse:
         raise HTTPException(status_code=400, detail=detail)
 
     try:
-        normalized_payload, stockholm_dt = _normalize_booking_payload(payload)
+        normalized_payload, _ = _normalize_booking_payload(payload)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
 
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            response = await client.post(WEBHOOK_URL, json=normalized_payload)
+        response = await http.post(
+            WEBHOOK_URL,
+            content=_dump_json(normalized_payload),
+            headers=_JSON_HEADERS,
+        )
     except httpx.HTTPError as exc:
         raise HTTPException(status_code=502, detail=f"Failed to reach booking service: {exc}") from exc
 
     webhook_status = response.status_code
     try:
-        webhook_body = response.json()
+        # stdlib json: orjson would turn integers wider than 64 bits into floats.
+        webhook_body = json.loads(response.content)
     except ValueError:
         webhook_body = {"raw": response.text}
 
@@ -161,27 +314,42 @@ async def book_appointment(request: BookRequest) -> BookResponse:
         "service": normalized_payload.get("Service"),
         "stylist": normalized_payload.get("Stylist"),
         "customer": normalized_payload.get("User_Name"),
-        "stockholm_iso": stockholm_dt.isoformat(),
-        "weekday": stockholm_dt.strftime("%A"),
+        "stockholm_iso": normalized_payload["ISODateTime"],
+        "weekday": normalized_payload["Weekday"],
     }
-
-    return BookResponse(
-        status="success",
-        appointment=appointment_info,
-        webhook_status=webhook_status,
-        webhook_response=webhook_body,
+    return _ORJSONResponse(
+        content={
+            "status": "success",
+            "appointment": appointment_info,
+            "webhook_status": webhook_status,
+            "webhook_response": webhook_body,
+        }
     )
 
 
 def _build_required_fields(
     required_fields: Sequence[str] | None,
     include_defaults: bool,
-) -> List[str]:
+) -> tuple[tuple[str, ...], frozenset[str]]:
+    """Return the ordered required fields plus a frozenset for membership tests."""
+    return _build_required_fields_cached(
+        tuple(required_fields) if required_fields else None,
+        include_defaults,
+    )
+
+
+@functools.lru_cache(maxsize=256)
+def _build_required_fields_cached(
+    required_fields: tuple[str, ...] | None,
+    include_defaults: bool,
+) -> tuple[tuple[str, ...], frozenset[str]]:
+    if not required_fields:
+        return _DEFAULT_REQUIRED_TUPLE, _DEFAULT_REQUIRED_SET
+
     fields: List[str] = []
     if include_defaults:
-        fields.extend(validator.DEFAULT_REQUIRED_FIELDS)
-    if required_fields:
-        fields.extend(required_fields)
+        fields.extend(_DEFAULT_REQUIRED_TUPLE)
+    fields.extend(required_fields)
 
     ordered: List[str] = []
     seen: set[str] = set()
@@ -190,41 +358,177 @@ def _build_required_fields(
             continue
         seen.add(field)
         ordered.append(field)
-    if not ordered:
-        return list(validator.DEFAULT_REQUIRED_FIELDS)
-    return ordered
+    return tuple(ordered), frozenset(seen)
+
+
+def _book_request_payload(request: BookRequest) -> dict[str, Any]:
+    """Equivalent of ``request.model_dump(exclude_none=True)`` without the serializer."""
+    payload: dict[str, Any] = {"Service": request.Service, "Phone": request.Phone}
+    if request.Stylist is not None:
+        payload["Stylist"] = request.Stylist
+    payload["Date"] = request.Date
+    if request.Use_name is not None:
+        payload["Use_name"] = request.Use_name
+    payload["Time"] = request.Time
+    payload["action"] = request.action
+    if request.model_extra:
+        for key, value in request.model_extra.items():
+            if value is not None:
+                payload[key] = value
+    return payload
 
 
 def _normalize_booking_payload(payload: dict[str, Any]) -> tuple[dict[str, Any], datetime]:
-    normalized = dict(payload)
-
-    user_name = normalized.get("Use_name") or normalized.get("User_Name")
+    """Return a normalized copy of ``payload`` and its Stockholm datetime."""
+    user_name = payload.get("Use_name") or payload.get("User_Name")
     if not user_name:
         raise ValueError("'Use_name' or 'User_Name' must be provided and non-empty.")
 
-    stockholm_dt = _parse_to_stockholm(normalized["Date"], normalized["Time"])
+    stockholm_dt = _parse_to_stockholm(payload["Date"], payload["Time"])
+
+    normalized = {_ALIAS_MAP.get(key, key): value for key, value in payload.items()}
 
-    normalized["Date"] = stockholm_dt.strftime("%Y-%m-%d")
-    normalized["Time"] = stockholm_dt.strftime("%H:%M")
-    normalized["Weekday"] = stockholm_dt.strftime("%A")
-    normalized["ISODateTime"] = stockholm_dt.isoformat()
+    (
+        normalized["Date"],
+        normalized["Time"],
+        normalized["Weekday"],
+        normalized["ISODateTime"],
+    ) = _format_stockholm(stockholm_dt)
     normalized["User_Name"] = user_name
-    normalized.pop("Use_name", None)
 
     return normalized, stockholm_dt
 
 
+def _format_stockholm(stockholm_dt: datetime) -> tuple[str, str, str, str]:
+    """Return the ``(Date, Time, Weekday, ISODateTime)`` strings for a booking."""
+    # Aware datetimes sharing a tzinfo compare equal regardless of ``fold``, so
+    # key on it explicitly to keep the repeated autumn hour apart.
+    return _format_stockholm_cached(stockholm_dt, stockholm_dt.fold)
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_stockholm_cached(stockholm_dt: datetime, fold: int) -> tuple[str, str, str, str]:
+    date_str = f"{stockholm_dt.year:04d}-{stockholm_dt.month:02d}-{stockholm_dt.day:02d}"
+    time_str = f"{stockholm_dt.hour:02d}:{stockholm_dt.minute:02d}"
+    offset = stockholm_dt.utcoffset()
+    if stockholm_dt.microsecond or (offset and offset.seconds % 60):
+        # Fractional seconds, or a sub-minute offset such as the pre-1900 LMT +01:12:12.
+        iso = stockholm_dt.isoformat()
+    else:
+        iso = f"{date_str}T{time_str}:{stockholm_dt.second:02d}{_format_utc_offset(offset)}"
+    return date_str, time_str, _WEEKDAY_NAMES[stockholm_dt.weekday()], iso
+
+
+def _format_utc_offset(offset: timedelta | None) -> str:
+    if not offset:
+        return "+00:00"
+    minutes = int(offset.total_seconds()) // 60
+    sign = "-" if minutes < 0 else "+"
+    hours, minutes = divmod(abs(minutes), 60)
+    return f"{sign}{hours:02d}:{minutes:02d}"
+
+
 def _parse_to_stockholm(date_str: str, time_str: str) -> datetime:
-    combined = f"{date_str} {time_str}".strip()
-    if not combined.strip():
+    combined = f"{date_str.strip()} {time_str.strip()}".strip()
+    if not combined:
         raise ValueError("Date and Time must be provided to schedule an appointment.")
 
+    stockholm_dt = _parse_canonical_to_stockholm(combined)
+    if stockholm_dt is None:
+        # Not cached: dateutil fills weekday names and missing years from today.
+        stockholm_dt = _to_stockholm(_parse_with_dateutil(combined))
+    return stockholm_dt
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_canonical_to_stockholm(combined: str) -> datetime | None:
+    parsed = _parse_canonical(combined)
+    if parsed is None:
+        return None
+    return _to_stockholm(parsed)
+
+
+def _to_stockholm(parsed: datetime) -> datetime:
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=ASSUMED_SOURCE_TZ)
+
+    utc = parsed.replace(tzinfo=None) - parsed.utcoffset()
+    cached = _stockholm_offset_for(utc.year, utc.month, utc.day, utc.hour)
+    if cached is None:
+        return parsed.astimezone(STOCKHOLM_TZ)
+    offset, fold = cached
+    return (utc + offset).replace(tzinfo=STOCKHOLM_TZ, fold=fold)
+
+
+@functools.lru_cache(maxsize=2048)
+def _stockholm_offset_for(year: int, month: int, day: int, hour: int) -> tuple[timedelta, int] | None:
+    """Return Stockholm's UTC offset and ``fold`` for the given UTC hour.
+
+    Stockholm's DST switches fall on whole UTC hours, so one lookup per hour is
+    exact. Returns ``None`` for an hour with an offset change inside it (the
+    1879 switch from local mean time); callers convert those exactly.
+    """
+    start = datetime(year, month, day, hour, tzinfo=_UTC)
+    local = start.astimezone(STOCKHOLM_TZ)
+    last = (start + timedelta(hours=1, microseconds=-1)).astimezone(STOCKHOLM_TZ)
+    if last.utcoffset() != local.utcoffset():
+        return None
+    return local.utcoffset(), local.fold
+
+
+def _parse_with_dateutil(combined: str) -> datetime:
+    # Imported lazily: dateutil is only needed for non-canonical input.
+    from dateutil import parser as date_parser
+
+    default = _dateutil_default()
+    try:
+        return date_parser.parse(combined, default=default)
+    except (ValueError, OverflowError):
+        pass
     try:
-        parsed = date_parser.parse(combined, fuzzy=True)
+        return date_parser.parse(combined, default=default, fuzzy=True)
     except (ValueError, OverflowError) as exc:
         raise ValueError(f"Could not understand date/time input: {combined!r}") from exc
 
-    if parsed.tzinfo is None:
-        parsed = parsed.replace(tzinfo=ASSUMED_SOURCE_TZ)
 
-    return parsed.astimezone(STOCKHOLM_TZ)
+def _dateutil_default() -> datetime:
+    """Return today's Stockholm date at midnight, naive, for dateutil to fill gaps from."""
+    return datetime.now(STOCKHOLM_TZ).replace(hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def _parse_canonical(combined: str) -> datetime | None:
+    """Parse the common ``YYYY-MM-DD HH:MM[:SS]`` form by slicing its digits."""
+    length = len(combined)
+    if (
+        length not in (16, 19)
+        or combined[4] != "-"
+        or combined[7] != "-"
+        or combined[10] != " "
+        or combined[13] != ":"
+        or (length == 19 and combined[16] != ":")
+    ):
+        return None
+    digits = combined[0:4] + combined[5:7] + combined[8:10] + combined[11:13] + combined[14:16] + combined[17:19]
+    if not (digits.isascii() and digits.isdigit()):
+        return None
+    try:
+        return datetime(
+            int(combined[0:4]),
+            int(combined[5:7]),
+            int(combined[8:10]),
+            int(combined[11:13]),
+            int(combined[14:16]),
+            int(combined[17:19]) if length == 19 else 0,
+        )
+    except ValueError:
+        return None
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    # The event loop is chosen by the server, not at import time. "auto" picks
+    # uvloop (shipped with uvicorn[standard]) and falls back to asyncio where it
+    # is absent, e.g. on Windows. From the command line:
+    #   uvicorn app:app --http httptools --loop uvloop --workers N
+    uvicorn.run("app:app", host="0.0.0.0", port=int(os.environ.get("PORT", "8000")), loop="auto")
@@ -4,17 +4,58 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
 import json
 import os
-from typing import Any, Dict, Optional
+import sys
+from typing import Any, Dict, Iterable, List, Optional
 
 import httpx
+import orjson
 
 DEFAULT_BASE_URL = "https://external.api.portal.bokadirekt.se"
 DEFAULT_TIMEOUT = 20.0
+DEFAULT_CONNECT_TIMEOUT = 3.0
 
 
-class BokaDirektClient:
+class _BokaDirektClientBase:
+    """Configuration shared by the sync and async Bokadirekt clients."""
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.api_key = api_key or os.environ.get("BOKADIREKT_API_KEY")
+        if not self.api_key:
+            raise ValueError("API key not provided. Set BOKADIREKT_API_KEY or pass api_key.")
+        self._headers = self._default_headers(self.api_key)
+        self._timeout = httpx.Timeout(self.timeout, connect=min(self.timeout, DEFAULT_CONNECT_TIMEOUT))
+
+    @staticmethod
+    def _default_headers(api_key: str) -> Dict[str, str]:
+        return {
+            "Accept": "application/json",
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+            "X-Api-Key": api_key,
+        }
+
+    @staticmethod
+    def _handle_response(response: httpx.Response) -> Dict[str, Any]:
+        body = _safe_json(response)
+        # Same range raise_for_status() accepts: anything outside 2xx is an error.
+        if not 200 <= response.status_code < 300:
+            raise RuntimeError(f"API request failed ({response.status_code}): {body}")
+        return body
+
+
+class BokaDirektClient(_BokaDirektClientBase):
     """Convenience wrapper around the Bokadirekt API.
 
     Notes
@@ -25,6 +66,9 @@ class BokaDirektClient:
       `Authorization: Bearer <key>` and `X-Api-Key: <key>`; adjust as needed.
     * Endpoints below reflect the public portal documentation as of writing.
       Verify paths/query parameters against the latest API specification.
+    * One pooled HTTP/2 connection set is reused for every call; use
+      ``with BokaDirektClient(...) as client:`` or call :meth:`close`.
+    * Use :class:`AsyncBokaDirektClient` from async code; this client blocks.
     """
 
     def __init__(
@@ -34,26 +78,20 @@ class BokaDirektClient:
         base_url: str = DEFAULT_BASE_URL,
         timeout: float = DEFAULT_TIMEOUT,
     ) -> None:
-        self.base_url = base_url.rstrip("/")
-        self.timeout = timeout
-        self.api_key = api_key or os.environ.get("BOKADIREKT_API_KEY")
-        if not self.api_key:
-            raise ValueError("API key not provided. Set BOKADIREKT_API_KEY or pass api_key.")
-
+        super().__init__(api_key, base_url=base_url, timeout=timeout)
         self._client = httpx.Client(
             base_url=self.base_url,
-            timeout=self.timeout,
-            headers=self._default_headers(self.api_key),
+            timeout=self._timeout,
+            headers=self._headers,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
         )
 
-    @staticmethod
-    def _default_headers(api_key: str) -> Dict[str, str]:
-        return {
-            "Accept": "application/json",
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {api_key}",
-            "X-Api-Key": api_key,
-        }
+    def __enter__(self) -> "BokaDirektClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
     def close(self) -> None:
         self._client.close()
@@ -76,13 +114,7 @@ class BokaDirektClient:
         stylist_id: str | None = None,
     ) -> Dict[str, Any]:
         """Retrieve availability slots for a service within a date range."""
-        params = {
-            "from": from_date,
-            "to": to_date,
-            "serviceId": service_id,
-        }
-        if stylist_id:
-            params["staffId"] = stylist_id
+        params = _availability_params(service_id, from_date, to_date, stylist_id)
         return self._get(f"/availability/{company_id}", params)
 
     def create_booking(self, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -91,10 +123,7 @@ class BokaDirektClient:
 
     def cancel_booking(self, booking_id: str, *, reason: str | None = None) -> Dict[str, Any]:
         """Cancel an existing booking."""
-        body: Dict[str, Any] = {"bookingId": booking_id}
-        if reason:
-            body["reason"] = reason
-        return self._post("/booking/cancel", json=body)
+        return self._post("/booking/cancel", json=_cancel_body(booking_id, reason))
 
     def raw_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         return self._get(path, params)
@@ -110,32 +139,155 @@ class BokaDirektClient:
         response = self._client.post(path, json=json)
         return self._handle_response(response)
 
-    @staticmethod
-    def _handle_response(response: httpx.Response) -> Dict[str, Any]:
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            detail = {
-                "status": exc.response.status_code,
-                "body": _safe_json(exc.response),
-            }
-            raise RuntimeError(f"API request failed ({detail['status']}): {detail['body']}") from exc
-        return _safe_json(response)
 
+class AsyncBokaDirektClient(_BokaDirektClientBase):
+    """Non-blocking variant of :class:`BokaDirektClient` for async callers.
+
+    Requests share one pooled HTTP/2 connection set. Use as
+    ``async with AsyncBokaDirektClient(...) as client:`` or call :meth:`close`.
+    """
 
+    def __init__(
+        self,
+        api_key: str | None = None,
+        *,
+        base_url: str = DEFAULT_BASE_URL,
+        timeout: float = DEFAULT_TIMEOUT,
+    ) -> None:
+        super().__init__(api_key, base_url=base_url, timeout=timeout)
+        self._client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=self._timeout,
+            headers=self._headers,
+            http2=True,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+        )
+
+    async def __aenter__(self) -> "AsyncBokaDirektClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        await self._client.aclose()
+
+    async def list_services(self, company_id: str) -> Dict[str, Any]:
+        """Fetch services for a company."""
+        return await self._get(f"/company/{company_id}/services")
+
+    async def list_staff(self, company_id: str) -> Dict[str, Any]:
+        """Fetch staff members for a company."""
+        return await self._get(f"/company/{company_id}/staff")
+
+    async def check_availability(
+        self,
+        company_id: str,
+        service_id: str,
+        *,
+        from_date: str,
+        to_date: str,
+        stylist_id: str | None = None,
+    ) -> Dict[str, Any]:
+        """Retrieve availability slots for a service within a date range."""
+        params = _availability_params(service_id, from_date, to_date, stylist_id)
+        return await self._get(f"/availability/{company_id}", params)
+
+    async def check_availability_many(
+        self,
+        company_id: str,
+        service_id: str,
+        stylist_ids: Iterable[str | None],
+        *,
+        from_date: str,
+        to_date: str,
+    ) -> List[Dict[str, Any]]:
+        """Check availability for several stylists concurrently.
+
+        Results are returned in the same order as ``stylist_ids``.
+        """
+        return await asyncio.gather(
+            *(
+                self.check_availability(
+                    company_id,
+                    service_id,
+                    from_date=from_date,
+                    to_date=to_date,
+                    stylist_id=stylist_id,
+                )
+                for stylist_id in stylist_ids
+            )
+        )
+
+    async def create_booking(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Create a booking. Payload must follow Bokadirekt's schema."""
+        return await self._post("/booking", json=payload)
+
+    async def cancel_booking(self, booking_id: str, *, reason: str | None = None) -> Dict[str, Any]:
+        """Cancel an existing booking."""
+        return await self._post("/booking/cancel", json=_cancel_body(booking_id, reason))
+
+    async def raw_get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        return await self._get(path, params)
+
+    async def raw_post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        return await self._post(path, json=payload)
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        response = await self._client.get(path, params=params)
+        return self._handle_response(response)
+
+    async def _post(self, path: str, json: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        response = await self._client.post(path, json=json)
+        return self._handle_response(response)
+
+
+def _availability_params(
+    service_id: str,
+    from_date: str,
+    to_date: str,
+    stylist_id: str | None,
+) -> Dict[str, Any]:
+    params: Dict[str, Any] = {"from": from_date, "to": to_date, "serviceId": service_id}
+    if stylist_id:
+        params["staffId"] = stylist_id
+    return params
+
+
+def _cancel_body(booking_id: str, reason: str | None) -> Dict[str, Any]:
+    body: Dict[str, Any] = {"bookingId": booking_id}
+    if reason:
+        body["reason"] = reason
+    return body
+
+
+# API responses and payload files are decoded with stdlib json: orjson would
+# silently turn integers wider than 64 bits into floats.
 def _safe_json(response: httpx.Response) -> Dict[str, Any]:
     try:
-        return response.json()
+        return json.loads(response.content)
     except ValueError:
         return {"raw": response.text}
 
 
 def _load_payload_from_file(path: str) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as handle:
+    with open(path, "rb") as handle:
         return json.load(handle)
 
 
+def _dump_output(result: Any) -> bytes:
+    try:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        return json.dumps(result, indent=2, ensure_ascii=False).encode("utf-8")
+
+
 def _parse_args() -> argparse.Namespace:
+    return _build_parser().parse_args()
+
+
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="CLI for the Bokadirekt API.")
     parser.add_argument("--api-key", dest="api_key", help="Bokadirekt API key. Falls back to BOKADIREKT_API_KEY.")
     parser.add_argument("--base-url", dest="base_url", default=DEFAULT_BASE_URL, help="Override API base URL.")
@@ -169,14 +321,12 @@ def _parse_args() -> argparse.Namespace:
     raw_post_parser.add_argument("path", help="Endpoint path, e.g., /foo/bar.")
     raw_post_parser.add_argument("payload", help="Path to JSON payload.")
 
-    return parser.parse_args()
+    return parser
 
 
 def main() -> None:
     args = _parse_args()
-    client = BokaDirektClient(api_key=args.api_key, base_url=args.base_url)
-
-    try:
+    with BokaDirektClient(api_key=args.api_key, base_url=args.base_url) as client:
         if args.command == "services":
             result = client.list_services(args.company_id)
         elif args.command == "staff":
@@ -203,9 +353,8 @@ def main() -> None:
         else:
             raise ValueError(f"Unsupported command: {args.command}")
 
-        print(json.dumps(result, indent=2, ensure_ascii=False))
-    finally:
-        client.close()
+        sys.stdout.buffer.write(_dump_output(result))
+        sys.stdout.buffer.write(b"\n")
 
 
 if __name__ == "__main__":
@@ -4,21 +4,60 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
+import functools
 import json
 import os
-from datetime import datetime
+import re
+import threading
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from urllib.parse import quote
 
+import google.auth.transport.requests
+import httplib2
+import httpx
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
+# Google caps batch requests at 50 calls each.
+BATCH_LIMIT = 50
+CALENDAR_API_URL = "https://www.googleapis.com/calendar/v3"
+FREEBUSY_URL = f"{CALENDAR_API_URL}/freeBusy"
+_RFC3339_RE = re.compile(
+    r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(?:\.\d+)?(Z|[+-]\d{2}:\d{2})",
+    re.ASCII,
+)
+_DAYS_IN_MONTH = (31, 29, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+# Refresh OAuth tokens this long before google-auth reports them expired.
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+FREEBUSY_ITEMS_LIMIT = 50
+# Per-thread ``{credentials_file: service}``; dropped when the thread exits.
+_thread_services = threading.local()
+# Matches googleapiclient's default socket timeout for the REST calls made here.
+REQUEST_TIMEOUT = httpx.Timeout(60.0)
 
 
 def get_calendar_service(credentials_path: str | None = None):
-    """Create an authenticated Calendar API service using a service account."""
+    """Return an authenticated Calendar API service using a service account.
+
+    Services are cached per credentials file and per thread, because the
+    underlying httplib2 transport must not be shared between threads.
+    """
+    credentials_file = _resolve_credentials_file(credentials_path)
+    services = getattr(_thread_services, "by_file", None)
+    if services is None:
+        services = _thread_services.by_file = {}
+    service = services.get(credentials_file)
+    if service is None:
+        service = services[credentials_file] = _build_calendar_service(credentials_file)
+    return service
+
+
+def _resolve_credentials_file(credentials_path: str | None) -> str:
     credentials_file = credentials_path or os.environ.get("GOOGLE_APPLICATION_CREDENTIALS")
     if not credentials_file:
         raise ValueError("Credentials path must be provided or GOOGLE_APPLICATION_CREDENTIALS set.")
@@ -26,14 +65,115 @@ def get_calendar_service(credentials_path: str | None = None):
     path = Path(credentials_file)
     if not path.exists():
         raise FileNotFoundError(f"Credentials file not found: {path}")
+    return str(path)
 
-    creds = service_account.Credentials.from_service_account_file(str(path), scopes=SCOPES)
-    return build("calendar", "v3", credentials=creds, cache_discovery=False)
+
+def _load_credentials(credentials_file: str) -> service_account.Credentials:
+    return service_account.Credentials.from_service_account_file(credentials_file, scopes=SCOPES)
+
+
+def _build_calendar_service(credentials_file: str):
+    creds = _load_credentials(credentials_file)
+    # static_discovery uses the discovery document bundled with the client
+    # library, so building the service never fetches it over HTTP.
+    return build("calendar", "v3", credentials=creds, cache_discovery=False, static_discovery=True)
+
+
+class _CalendarRest:
+    """Direct Calendar v3 REST calls over one pooled HTTP/2 connection.
+
+    Used for the single-event helpers so they skip googleapiclient's generated
+    request wrappers. The bearer token is refreshed only when it is close to
+    expiring.
+    """
+
+    def __init__(self, credentials: Any, *, transport: httpx.BaseTransport | None = None) -> None:
+        self._credentials = credentials
+        self._token_lock = threading.Lock()
+        self._client = httpx.Client(
+            base_url=CALENDAR_API_URL,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=300),
+            timeout=REQUEST_TIMEOUT,
+            transport=transport,
+        )
+
+    def access_token(self) -> str:
+        with self._token_lock:
+            creds = self._credentials
+            expiry = creds.expiry
+            now = datetime.now(timezone.utc).replace(tzinfo=None)
+            if not creds.token or (expiry is not None and expiry - TOKEN_REFRESH_MARGIN <= now):
+                creds.refresh(google.auth.transport.requests.Request())
+            return creds.token
+
+    def close(self) -> None:
+        self._client.close()
+
+    def insert_event(self, calendar_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._request("POST", _events_path(calendar_id), json=body)
+
+    def update_event(self, calendar_id: str, event_id: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._request("PUT", f"{_events_path(calendar_id)}/{quote(event_id, safe='')}", json=body)
+
+    def delete_event(self, calendar_id: str, event_id: str) -> None:
+        self._request("DELETE", f"{_events_path(calendar_id)}/{quote(event_id, safe='')}")
+
+    def list_events(self, calendar_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._request("GET", _events_path(calendar_id), params=params)
+
+    def query_freebusy(self, body: Dict[str, Any]) -> Dict[str, Any]:
+        return self._request("POST", "/freeBusy", json=body)
+
+    def _request(
+        self,
+        method: str,
+        path: str,
+        *,
+        params: Optional[Dict[str, Any]] = None,
+        json: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        response = self._client.request(
+            method,
+            path,
+            params=params,
+            json=json,
+            headers={"Authorization": f"Bearer {self.access_token()}"},
+        )
+        _raise_for_status(response)
+        if not response.content:
+            return None
+        return response.json()
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    """Raise :class:`HttpError` for a non-2xx response, as googleapiclient would.
+
+    The REST and batch helpers then fail with the same exception type, and
+    Google's JSON error body is kept on ``HttpError.content``.
+    """
+    if response.is_success:
+        return
+    resp = httplib2.Response({**response.headers, "status": str(response.status_code)})
+    resp.reason = response.reason_phrase
+    raise HttpError(resp, response.content, uri=str(response.request.url))
+
+
+def _events_path(calendar_id: str) -> str:
+    return f"/calendars/{quote(calendar_id, safe='')}/events"
+
+
+def _get_calendar_rest(credentials_path: str | None = None) -> _CalendarRest:
+    return _get_calendar_rest_cached(_resolve_credentials_file(credentials_path))
+
+
+@functools.lru_cache(maxsize=4)
+def _get_calendar_rest_cached(credentials_file: str) -> _CalendarRest:
+    return _CalendarRest(_load_credentials(credentials_file))
 
 
 def create_event(calendar_id: str, event_body: Dict[str, Any], credentials_path: str | None = None) -> Dict[str, Any]:
-    service = get_calendar_service(credentials_path)
-    return service.events().insert(calendarId=calendar_id, body=event_body).execute()
+    return _get_calendar_rest(credentials_path).insert_event(calendar_id, event_body)
 
 
 def update_event(
@@ -42,13 +182,74 @@ def update_event(
     event_body: Dict[str, Any],
     credentials_path: str | None = None,
 ) -> Dict[str, Any]:
-    service = get_calendar_service(credentials_path)
-    return service.events().update(calendarId=calendar_id, eventId=event_id, body=event_body).execute()
+    return _get_calendar_rest(credentials_path).update_event(calendar_id, event_id, event_body)
 
 
 def delete_event(calendar_id: str, event_id: str, credentials_path: str | None = None) -> None:
+    _get_calendar_rest(credentials_path).delete_event(calendar_id, event_id)
+
+
+def create_events_batch(
+    calendar_id: str,
+    event_bodies: Iterable[Dict[str, Any]],
+    credentials_path: str | None = None,
+) -> List[Dict[str, Any]]:
+    """Insert many events using batch requests; results follow input order."""
+    service = get_calendar_service(credentials_path)
+    events = service.events()
+    requests = [events.insert(calendarId=calendar_id, body=body) for body in event_bodies]
+    return _execute_batched(service, requests)
+
+
+def update_events_batch(
+    calendar_id: str,
+    updates: Iterable[Tuple[str, Dict[str, Any]]],
+    credentials_path: str | None = None,
+) -> List[Dict[str, Any]]:
+    """Update many ``(event_id, event_body)`` pairs using batch requests."""
     service = get_calendar_service(credentials_path)
-    service.events().delete(calendarId=calendar_id, eventId=event_id).execute()
+    events = service.events()
+    requests = [
+        events.update(calendarId=calendar_id, eventId=event_id, body=body) for event_id, body in updates
+    ]
+    return _execute_batched(service, requests)
+
+
+def delete_events_batch(
+    calendar_id: str,
+    event_ids: Iterable[str],
+    credentials_path: str | None = None,
+) -> None:
+    """Delete many events using batch requests."""
+    service = get_calendar_service(credentials_path)
+    events = service.events()
+    requests = [events.delete(calendarId=calendar_id, eventId=event_id) for event_id in event_ids]
+    _execute_batched(service, requests)
+
+
+def _execute_batched(service, requests: Sequence[Any]) -> List[Any]:
+    """Run ``requests`` in batches of :data:`BATCH_LIMIT` and return responses in order.
+
+    The first failed sub-request is raised once its batch has finished; later
+    batches are not sent.
+    """
+    results: List[Any] = [None] * len(requests)
+    errors: List[Exception] = []
+
+    def callback(request_id: str, response: Any, exception: Exception | None) -> None:
+        if exception is not None:
+            errors.append(exception)
+        else:
+            results[int(request_id)] = response
+
+    for start in range(0, len(requests), BATCH_LIMIT):
+        batch = service.new_batch_http_request(callback=callback)
+        for index in range(start, min(start + BATCH_LIMIT, len(requests))):
+            batch.add(requests[index], request_id=str(index))
+        batch.execute()
+        if errors:
+            raise errors[0]
+    return results
 
 
 def list_events(
@@ -58,10 +259,7 @@ def list_events(
     max_results: int = 10,
     credentials_path: str | None = None,
 ) -> Iterable[Dict[str, Any]]:
-    service = get_calendar_service(credentials_path)
-
     params: Dict[str, Any] = {
-        "calendarId": calendar_id,
         "maxResults": max_results,
         "singleEvents": True,
         "orderBy": "startTime",
@@ -71,7 +269,7 @@ def list_events(
     if time_max:
         params["timeMax"] = _ensure_rfc3339(time_max)
 
-    response = service.events().list(**params).execute()
+    response = _get_calendar_rest(credentials_path).list_events(calendar_id, params)
     return response.get("items", [])
 
 
@@ -81,18 +279,114 @@ def check_availability(
     end: str,
     credentials_path: str | None = None,
 ) -> Dict[str, Any]:
-    service = get_calendar_service(credentials_path)
     body = {
         "timeMin": _ensure_rfc3339(start),
         "timeMax": _ensure_rfc3339(end),
         "items": [{"id": calendar_id}],
     }
-    response = service.freebusy().query(body=body).execute()
+    response = _get_calendar_rest(credentials_path).query_freebusy(body)
     return response["calendars"].get(calendar_id, {})
 
 
+async def check_availability_many(
+    calendar_ids: Sequence[str],
+    start: str,
+    end: str,
+    credentials_path: str | None = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Query free/busy for many calendars concurrently.
+
+    Calendars are grouped into queries of :data:`FREEBUSY_ITEMS_LIMIT` and the
+    queries are sent together over one pooled HTTP/2 client, bypassing the
+    synchronous googleapiclient transport. Returns a mapping of calendar ID to
+    its free/busy entry.
+    """
+    if not calendar_ids:
+        return {}
+    time_min = _ensure_rfc3339(start)
+    time_max = _ensure_rfc3339(end)
+    token = await _fetch_access_token(credentials_path)
+    headers = {"Authorization": f"Bearer {token}"}
+    bodies = [
+        {
+            "timeMin": time_min,
+            "timeMax": time_max,
+            "items": [{"id": calendar_id} for calendar_id in calendar_ids[index : index + FREEBUSY_ITEMS_LIMIT]],
+        }
+        for index in range(0, len(calendar_ids), FREEBUSY_ITEMS_LIMIT)
+    ]
+
+    async with httpx.AsyncClient(
+        http2=True,
+        headers=headers,
+        limits=httpx.Limits(max_keepalive_connections=50),
+        timeout=REQUEST_TIMEOUT,
+    ) as client:
+        tasks = [asyncio.ensure_future(_query_freebusy(client, body)) for body in bodies]
+        try:
+            results = await asyncio.gather(*tasks)
+        except BaseException:
+            # Stop the sibling queries before the client closes underneath them.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    calendars: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        calendars.update(result)
+    return {calendar_id: calendars.get(calendar_id, {}) for calendar_id in calendar_ids}
+
+
+async def _query_freebusy(client: httpx.AsyncClient, body: Dict[str, Any]) -> Dict[str, Any]:
+    response = await client.post(FREEBUSY_URL, json=body)
+    _raise_for_status(response)
+    return response.json().get("calendars", {})
+
+
+async def _fetch_access_token(credentials_path: str | None) -> str:
+    rest = _get_calendar_rest(credentials_path)
+    # google-auth refreshes synchronously; keep it off the event loop.
+    return await asyncio.to_thread(rest.access_token)
+
+
 def _ensure_rfc3339(value: str) -> str:
     """Parse incoming date/time and output RFC3339 format if possible."""
+    fast = _ensure_rfc3339_fast(value)
+    if fast is not None:
+        return fast
+    return _ensure_rfc3339_slow(value)
+
+
+def _ensure_rfc3339_fast(value: str) -> str | None:
+    """Handle already-canonical RFC3339 strings without building a datetime.
+
+    Returns ``None`` for anything the precompiled pattern does not match so the
+    caller can fall back to :func:`_ensure_rfc3339_slow`.
+    """
+    match = _RFC3339_RE.fullmatch(value)
+    if match is None:
+        return None
+
+    year, month, day, hour, minute, second = (int(part) for part in match.group(1, 2, 3, 4, 5, 6))
+    if not 1 <= month <= 12 or not 1 <= day <= _DAYS_IN_MONTH[month - 1]:
+        return None
+    if month == 2 and day == 29 and not (year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)):
+        return None
+    if hour > 23 or minute > 59 or second > 59:
+        return None
+
+    offset = match.group(7)
+    if offset == "Z":
+        return value
+    if offset in ("+00:00", "-00:00"):
+        return value[:-6] + "Z"
+    if int(offset[1:3]) > 23 or int(offset[4:6]) > 59:
+        return None
+    return value
+
+
+def _ensure_rfc3339_slow(value: str) -> str:
     try:
         parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
     except ValueError as exc:
@@ -104,13 +398,20 @@ def _ensure_rfc3339(value: str) -> str:
 
 def _load_event_from_json(source: str) -> Dict[str, Any]:
     path = Path(source)
-    if not path.exists():
+    try:
+        raw = path.read_bytes()
+    except FileNotFoundError:
         raise FileNotFoundError(f"Event JSON file not found: {path}")
-    with path.open("r", encoding="utf-8") as handle:
-        return json.load(handle)
+    # stdlib json: orjson would turn integers wider than 64 bits into floats.
+    return json.loads(raw)
 
 
 def _parse_args() -> argparse.Namespace:
+    return _build_parser().parse_args()
+
+
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Google Calendar helper CLI.")
     parser.add_argument("--credentials", dest="credentials", help="Path to service account JSON.")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -139,7 +440,7 @@ def _parse_args() -> argparse.Namespace:
     freebusy_parser.add_argument("start", help="Window start (RFC3339).")
     freebusy_parser.add_argument("end", help="Window end (RFC3339).")
 
-    return parser.parse_args()
+    return parser
 
 
 def main() -> None:
@@ -177,7 +478,7 @@ def main() -> None:
             print(json.dumps(availability, indent=2))
         else:
             raise ValueError(f"Unknown command: {args.command}")
-    except (HttpError, ValueError, FileNotFoundError) as exc:
+    except (HttpError, httpx.HTTPError, ValueError, FileNotFoundError) as exc:
         raise SystemExit(f"error: {exc}") from exc
 
 
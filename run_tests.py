@@ -1,15 +1,26 @@
 #!/usr/bin/env python3
 # Aurora Polaris 2025. All rights reserved.
-"""Convenience test runner for the project."""
+"""Convenience test runner for the project.
+
+Runs pytest in-process; pass ``--isolated`` to run it in a fresh interpreter
+instead (e.g. for coverage tooling).
+"""
 from __future__ import annotations
 
 import subprocess
 import sys
+from typing import Sequence
+
+
+def main(argv: Sequence[str] | None = None) -> int:
+    args = list(sys.argv[1:] if argv is None else argv)
+    if "--isolated" in args:
+        args.remove("--isolated")
+        return subprocess.call([sys.executable, "-m", "pytest", "-q", *args])
 
+    import pytest
 
-def main() -> int:
-    args = [sys.executable, "-m", "pytest", "-q"]
-    return subprocess.call(args)
+    return int(pytest.main(["-q", *args]))
 
 
 if __name__ == "__main__":
@@ -1,10 +1,15 @@
 # Aurora Polaris 2025. All rights reserved.
 from datetime import datetime, timezone
+import itertools
+import json
+import logging
 from types import SimpleNamespace
 from typing import Any
 
 import httpx
+import orjson
 import pytest
+from dateutil import parser as date_parser
 from fastapi.testclient import TestClient
 
 import app
@@ -15,6 +20,7 @@ class DummyResponse:
         self.status_code = status_code
         self._data = data
         self.text = "{}" if data is None else str(data)
+        self.content = orjson.dumps(data)
 
     def json(self):
         return self._data
@@ -23,16 +29,10 @@ class DummyResponse:
 class DummyAsyncClient:
     def __init__(self, *, response: DummyResponse | Exception):
         self._response_or_exc = response
+        self.posted: list[dict[str, Any]] = []
 
-    async def __aenter__(self):
-        if isinstance(self._response_or_exc, Exception):
-            raise self._response_or_exc
-        return self
-
-    async def __aexit__(self, *exc_info):
-        return False
-
-    async def post(self, url: str, json: dict[str, Any]):
+    async def post(self, url: str, *, content: bytes, headers: dict[str, str]):
+        self.posted.append({"url": url, "content": content, "headers": headers})
         if isinstance(self._response_or_exc, Exception):
             raise self._response_or_exc
         return self._response_or_exc
@@ -40,19 +40,14 @@ class DummyAsyncClient:
 
 @pytest.fixture
 def client(monkeypatch):
-    test_client = TestClient(app.app)
-    yield test_client
-    test_client.close()
+    with TestClient(app.app) as test_client:
+        yield test_client
 
 
 @pytest.fixture
 def successful_webhook(monkeypatch):
     response = DummyResponse(200, {"status": "ok"})
-
-    def _async_client_factory(*args, **kwargs):
-        return DummyAsyncClient(response=response)
-
-    monkeypatch.setattr(app.httpx, "AsyncClient", _async_client_factory)
+    monkeypatch.setattr(app.app.state, "http", DummyAsyncClient(response=response), raising=False)
 
 
 def test_parse_to_stockholm_naive_time():
@@ -134,11 +129,7 @@ def test_book_endpoint_success(client, monkeypatch, successful_webhook):
 
 def test_book_endpoint_webhook_error_response(client, monkeypatch):
     response_obj = DummyResponse(500, {"detail": "error"})
-
-    def _async_client_factory(*args, **kwargs):
-        return DummyAsyncClient(response=response_obj)
-
-    monkeypatch.setattr(app.httpx, "AsyncClient", _async_client_factory)
+    monkeypatch.setattr(app.app.state, "http", DummyAsyncClient(response=response_obj), raising=False)
 
     payload = {
         "Service": "Cut",
@@ -154,10 +145,8 @@ def test_book_endpoint_webhook_error_response(client, monkeypatch):
 
 
 def test_book_endpoint_webhook_connection_error(client, monkeypatch):
-    def _async_client_factory(*args, **kwargs):
-        return DummyAsyncClient(response=httpx.HTTPError("boom"))
-
-    monkeypatch.setattr(app.httpx, "AsyncClient", _async_client_factory)
+    dummy = DummyAsyncClient(response=httpx.HTTPError("boom"))
+    monkeypatch.setattr(app.app.state, "http", dummy, raising=False)
 
     payload = {
         "Service": "Cut",
@@ -184,3 +173,338 @@ def test_book_endpoint_missing_field_returns_400(client):
     response = client.post("/book", json=payload)
     assert response.status_code == 400
     assert "missing" in response.json()["detail"]
+
+
+def test_parse_to_stockholm_canonical_skips_dateutil(monkeypatch):
+    def _fail(*args, **kwargs):
+        raise AssertionError("dateutil should not be used for canonical input")
+
+    monkeypatch.setattr(date_parser, "parse", _fail)
+    dt = app._parse_to_stockholm(" 2024-06-01 ", "12:00:30")
+    assert (dt.hour, dt.minute, dt.second) == (14, 0, 30)
+
+
+def test_parse_to_stockholm_falls_back_to_dateutil():
+    dt = app._parse_to_stockholm("June 1 2024", "12:00")
+    assert dt.strftime("%Y-%m-%d %H:%M") == "2024-06-01 14:00"
+
+
+def test_parse_to_stockholm_reuses_cached_result():
+    app._parse_canonical_to_stockholm.cache_clear()
+    first = app._parse_to_stockholm("2024-06-01", "12:00")
+    second = app._parse_to_stockholm("2024-06-01 ", " 12:00")
+    assert first is second
+    assert app._parse_canonical_to_stockholm.cache_info().hits == 1
+
+
+def test_parse_to_stockholm_does_not_cache_dateutil_results(monkeypatch):
+    calls = []
+    real_parse = date_parser.parse
+
+    def _counting_parse(*args, **kwargs):
+        calls.append(args)
+        return real_parse(*args, **kwargs)
+
+    monkeypatch.setattr(date_parser, "parse", _counting_parse)
+    app._parse_to_stockholm("Friday", "14:00")
+    app._parse_to_stockholm("Friday", "14:00")
+    assert len(calls) == 2
+
+
+def test_lifespan_shares_one_http_client():
+    with TestClient(app.app):
+        shared = app.app.state.http
+        assert isinstance(shared, httpx.AsyncClient)
+        assert not shared.is_closed
+    assert shared.is_closed
+
+
+def test_format_stockholm_distinguishes_repeated_dst_hour():
+    first = app._parse_to_stockholm("2024-10-27", "00:30")
+    second = app._parse_to_stockholm("2024-10-27", "01:30")
+    assert first.replace(tzinfo=None) == second.replace(tzinfo=None)
+    assert app._format_stockholm(first)[3].endswith("+02:00")
+    assert app._format_stockholm(second)[3].endswith("+01:00")
+
+
+def test_build_required_fields_defaults_and_dedup():
+    defaults = tuple(app.validator.DEFAULT_REQUIRED_FIELDS)
+    assert app._build_required_fields(None, True) == (defaults, frozenset(defaults))
+    assert app._build_required_fields([], False)[0] == defaults
+    merged, merged_set = app._build_required_fields(["Custom", "Service"], True)
+    assert merged == defaults + ("Custom",)
+    assert merged_set == frozenset(merged)
+    assert app._build_required_fields(["Custom", "Service"], False)[0] == ("Custom", "Service")
+
+
+def test_book_request_payload_matches_model_dump():
+    request = app.BookRequest.model_validate(
+        {
+            "Service": "Cut",
+            "Phone": "123",
+            "Date": "2024-06-01",
+            "User_Name": "Jamie",
+            "Time": "13:00",
+            "action": "book",
+            "Notes": "window seat",
+            "Ignored": None,
+        }
+    )
+    payload = app._book_request_payload(request)
+    assert payload == request.model_dump(exclude_none=True)
+    assert list(payload) == list(request.model_dump(exclude_none=True))
+
+
+def test_book_endpoint_posts_orjson_payload(client, monkeypatch):
+    dummy = DummyAsyncClient(response=DummyResponse(200, {"status": "ok"}))
+    monkeypatch.setattr(app.app.state, "http", dummy, raising=False)
+
+    payload = {
+        "Service": "Cut",
+        "Phone": "123",
+        "Stylist": "Alex",
+        "Date": "2024-06-01",
+        "Use_name": "Jamie",
+        "Time": "13:00",
+        "action": "book",
+    }
+    response = client.post("/book", json=payload)
+    assert response.status_code == 200
+    assert response.json()["webhook_response"] == {"status": "ok"}
+
+    sent = dummy.posted[-1]
+    assert sent["headers"]["content-type"] == "application/json"
+    body = orjson.loads(sent["content"])
+    assert body["User_Name"] == "Jamie"
+    assert body["Time"] == "15:00"
+
+
+def test_book_endpoint_forwards_integers_wider_than_64_bits(client, monkeypatch):
+    dummy = DummyAsyncClient(response=DummyResponse(200, {"status": "ok"}))
+    monkeypatch.setattr(app.app.state, "http", dummy, raising=False)
+
+    payload = {
+        "Service": "Cut",
+        "Phone": "123",
+        "Stylist": "Alex",
+        "Date": "2024-06-01",
+        "Use_name": "Jamie",
+        "Time": "13:00",
+        "action": "book",
+        "Ref": 123456789012345678901234567890,
+    }
+    response = client.post("/book", json=payload)
+    assert response.status_code == 200
+    assert json.loads(dummy.posted[-1]["content"])["Ref"] == 123456789012345678901234567890
+
+
+def test_book_endpoint_keeps_wide_integers_in_webhook_response(client, monkeypatch):
+    webhook_response = DummyResponse(200, {})
+    webhook_response.content = b'{"ref": 123456789012345678901234567890}'
+    monkeypatch.setattr(app.app.state, "http", DummyAsyncClient(response=webhook_response), raising=False)
+
+    payload = {
+        "Service": "Cut",
+        "Phone": "123",
+        "Stylist": "Alex",
+        "Date": "2024-06-01",
+        "Use_name": "Jamie",
+        "Time": "13:00",
+        "action": "book",
+    }
+    response = client.post("/book", json=payload)
+    assert response.status_code == 200
+    assert response.json()["webhook_response"] == {"ref": 123456789012345678901234567890}
+
+
+def test_book_endpoint_wide_integer_validation_error_returns_422(client):
+    payload = {
+        "Service": "Cut",
+        "Phone": 123456789012345678901234567890,
+        "Stylist": "Alex",
+        "Date": "2024-06-01",
+        "Use_name": "Jamie",
+        "Time": "13:00",
+        "action": "book",
+    }
+    response = client.post("/book", json=payload)
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["input"] == 123456789012345678901234567890
+
+
+def test_book_endpoint_invalid_body_returns_422(client):
+    response = client.post("/book", json={"Service": "Cut"})
+    assert response.status_code == 422
+    locs = [tuple(error["loc"]) for error in response.json()["detail"]]
+    assert ("body", "Phone") in locs
+    for error in response.json()["detail"]:
+        assert set(error) == {"type", "loc", "msg", "input"}
+
+
+def test_book_endpoint_malformed_json_returns_422(client):
+    response = client.post("/book", content=b"{not json", headers={"content-type": "application/json"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == [
+        {
+            "type": "json_invalid",
+            "loc": ["body", 1],
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": "Expecting property name enclosed in double quotes"},
+        }
+    ]
+
+
+def test_book_endpoint_undecodable_body_returns_400(client):
+    response = client.post("/book", content=b"\xff{", headers={"content-type": "application/json"})
+    assert response.status_code == 400
+    assert response.json() == {"detail": "There was an error parsing the body"}
+
+
+def test_book_endpoint_empty_body_returns_missing_422(client):
+    response = client.post("/book", content=b"", headers={"content-type": "application/json"})
+    assert response.status_code == 422
+    assert response.json()["detail"] == [
+        {"type": "missing", "loc": ["body"], "msg": "Field required", "input": None}
+    ]
+
+
+@pytest.mark.parametrize(
+    ("date_str", "time_str"),
+    [
+        ("2024-06-01", "13:00"),
+        ("2024-01-15", "08:05:09"),
+        ("2024-10-27", "01:30"),
+        ("June 3 2024", "10:00:00.250"),
+        ("1800-01-01", "12:00"),
+    ],
+)
+def test_format_stockholm_matches_strftime(date_str, time_str):
+    dt = app._parse_to_stockholm(date_str, time_str)
+    assert app._format_stockholm(dt) == (
+        dt.strftime("%Y-%m-%d"),
+        dt.strftime("%H:%M"),
+        dt.strftime("%A"),
+        dt.isoformat(),
+    )
+
+
+def test_openapi_documents_response_models(client):
+    schema = client.get("/openapi.json").json()
+    book_200 = schema["paths"]["/book"]["post"]["responses"]["200"]
+    validate_200 = schema["paths"]["/validate"]["post"]["responses"]["200"]
+    assert book_200["content"]["application/json"]["schema"]["$ref"].endswith("/BookResponse")
+    assert validate_200["content"]["application/json"]["schema"]["$ref"].endswith("/ValidationResponse")
+
+
+@pytest.mark.parametrize(
+    ("date_str", "time_str"),
+    [
+        ("2024-03-31", "00:59"),
+        ("2024-03-31", "01:00"),
+        ("2024-10-27", "00:30"),
+        ("2024-10-27", "01:00"),
+        ("2024-06-01T12:00:00+05:30", ""),
+        ("1878-12-31", "22:30"),
+        ("1878-12-31", "22:50"),
+    ],
+)
+def test_parse_to_stockholm_matches_astimezone_across_dst(date_str, time_str):
+    from dateutil import parser as dateutil_parser
+
+    dt = app._parse_to_stockholm(date_str, time_str)
+    source = dateutil_parser.parse(f"{date_str} {time_str}".strip())
+    if source.tzinfo is None:
+        source = source.replace(tzinfo=timezone.utc)
+    expected = source.astimezone(app.STOCKHOLM_TZ)
+    assert dt.isoformat() == expected.isoformat()
+    assert dt.fold == expected.fold
+
+
+def test_parse_to_stockholm_retries_fuzzy_for_garbled_input():
+    dt = app._parse_to_stockholm("2024-06-01", "at 13:00 please")
+    assert dt.strftime("%Y-%m-%d %H:%M") == "2024-06-01 15:00"
+
+
+def test_parse_to_stockholm_resolves_weekday_and_yearless_date_from_today(monkeypatch):
+    # 2024-06-05 is a Wednesday.
+    monkeypatch.setattr(app, "_dateutil_default", lambda: datetime(2024, 6, 5))
+    friday = app._parse_to_stockholm("Friday", "14:00")
+    assert friday.isoformat() == "2024-06-07T16:00:00+02:00"
+    june = app._parse_to_stockholm("June 3", "10:00")
+    assert june.isoformat() == "2024-06-03T12:00:00+02:00"
+
+    monkeypatch.setattr(app, "_dateutil_default", lambda: datetime(2024, 6, 12))
+    assert app._parse_to_stockholm("Friday", "14:00").isoformat() == "2024-06-14T16:00:00+02:00"
+
+
+def test_parse_to_stockholm_rejects_unparseable_input():
+    with pytest.raises(ValueError):
+        app._parse_to_stockholm("someday", "soon")
+
+
+def test_book_validation_failures_are_sampled(client, monkeypatch, caplog):
+    monkeypatch.setattr(app, "BOOK_VALIDATION_LOG_EVERY", 2)
+    monkeypatch.setattr(app, "_book_validation_failures", itertools.count())
+
+    with caplog.at_level(logging.WARNING, logger="payload_validator"):
+        for _ in range(4):
+            response = client.post("/book", content=b"{bad", headers={"content-type": "application/json"})
+            assert response.status_code == 422
+
+    messages = [record.getMessage() for record in caplog.records if "Validation failure" in record.getMessage()]
+    assert len(messages) == 2
+    assert "body={bad" in messages[0]
+
+
+def test_book_endpoint_uses_injected_webhook_client(client):
+    dummy = DummyAsyncClient(response=DummyResponse(201, {"id": "abc"}))
+    app.app.dependency_overrides[app.get_webhook_client] = lambda: dummy
+    try:
+        response = client.post(
+            "/book",
+            json={
+                "Service": "Cut",
+                "Phone": "123",
+                "Date": "2024-06-01",
+                "Use_name": "Jamie",
+                "Stylist": "Alex",
+                "Time": "13:00",
+                "action": "book",
+            },
+        )
+    finally:
+        app.app.dependency_overrides.clear()
+    assert response.status_code == 200
+    assert response.json()["webhook_status"] == 201
+    assert len(dummy.posted) == 1
+
+
+def test_normalize_booking_payload_renames_in_one_pass():
+    payload = {
+        "Service": "Cut",
+        "Use_name": "",
+        "User_Name": "Robin",
+        "Date": "2024-06-01",
+        "Time": "13:00",
+    }
+    normalized, _ = app._normalize_booking_payload(payload)
+    assert "Use_name" not in normalized
+    assert normalized["User_Name"] == "Robin"
+    assert payload["Time"] == "13:00"
+
+
+@pytest.mark.parametrize(
+    "combined",
+    ["2024-06-01 13:00", "2024-06-01 13:00:59", "2024-6-01 13:00", "2024-06-01T13:00", "2024-02-30 13:00", "２０２４-06-01 13:00"],
+)
+def test_parse_canonical_matches_strptime(combined):
+    try:
+        expected = datetime.strptime(combined, "%Y-%m-%d %H:%M:%S" if combined.count(":") == 2 else "%Y-%m-%d %H:%M")
+    except ValueError:
+        expected = None
+    result = app._parse_canonical(combined)
+    if len(combined) in (16, 19) and combined.isascii():
+        assert result == expected
+    else:
+        assert result is None
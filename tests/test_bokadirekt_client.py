@@ -1,4 +1,5 @@
 # Aurora Polaris 2025. All rights reserved.
+import asyncio
 import json
 from types import SimpleNamespace
 
@@ -8,27 +9,26 @@ import pytest
 import bokadirekt_client as bd
 
 
+def make_response(data, status_code=200):
+    return SimpleNamespace(
+        json=lambda: data,
+        content=json.dumps(data).encode("utf-8"),
+        status_code=status_code,
+        text=json.dumps(data),
+    )
+
+
 class FakeClient:
     def __init__(self, *args, **kwargs):
         self.requests = []
 
     def get(self, path, params=None):
         self.requests.append(("GET", path, params))
-        return SimpleNamespace(
-            json=lambda: {"method": "GET", "path": path, "params": params},
-            status_code=200,
-            text="{}",
-            raise_for_status=lambda: None,
-        )
+        return make_response({"method": "GET", "path": path, "params": params})
 
     def post(self, path, json=None):
         self.requests.append(("POST", path, json))
-        return SimpleNamespace(
-            json=lambda: {"method": "POST", "path": path, "json": json},
-            status_code=200,
-            text="{}",
-            raise_for_status=lambda: None,
-        )
+        return make_response({"method": "POST", "path": path, "json": json})
 
     def close(self):
         pass
@@ -49,6 +49,14 @@ def test_default_headers(monkeypatch):
     client.close()
 
 
+def test_check_availability_skips_empty_staff_id(monkeypatch):
+    client, fake = make_client(monkeypatch)
+    client.check_availability("123", "svc", from_date="2024-06-01", to_date="2024-06-02", stylist_id="")
+    _, _, params = fake.requests[-1]
+    assert "staffId" not in params
+    client.close()
+
+
 def test_list_services_uses_get(monkeypatch):
     client, fake = make_client(monkeypatch)
     data = client.list_services("123")
@@ -95,3 +103,148 @@ def test_raw_post_uses_payload(monkeypatch, tmp_path):
     assert path == "/custom"
     assert body["foo"] == "bar"
     client.close()
+
+
+class FakeAsyncClient(FakeClient):
+    async def get(self, path, params=None):
+        return FakeClient.get(self, path, params=params)
+
+    async def post(self, path, json=None):
+        return FakeClient.post(self, path, json=json)
+
+    async def aclose(self):
+        self.closed = True
+
+
+def make_async_client(monkeypatch):
+    fake = FakeAsyncClient()
+    monkeypatch.setattr(bd.httpx, "AsyncClient", lambda *args, **kwargs: fake)
+    client = bd.AsyncBokaDirektClient(api_key="KEY", base_url="https://example.com")
+    return client, fake
+
+
+def test_async_client_check_availability_and_close(monkeypatch):
+    client, fake = make_async_client(monkeypatch)
+
+    async def run():
+        async with client:
+            return await client.check_availability(
+                "123",
+                "svc",
+                from_date="2024-06-01",
+                to_date="2024-06-02",
+                stylist_id="sty",
+            )
+
+    data = asyncio.run(run())
+    method, path, params = fake.requests[-1]
+    assert method == "GET"
+    assert params["staffId"] == "sty"
+    assert data["path"] == "/availability/123"
+    assert fake.closed is True
+
+
+def test_async_client_cancel_booking_sends_post(monkeypatch):
+    client, fake = make_async_client(monkeypatch)
+    data = asyncio.run(client.cancel_booking("booking-1", reason="test"))
+    method, path, body = fake.requests[-1]
+    assert method == "POST"
+    assert body == {"bookingId": "booking-1", "reason": "test"}
+    assert data["path"] == "/booking/cancel"
+
+
+def test_main_prints_indented_json(monkeypatch, capsysbinary):
+    client, _ = make_client(monkeypatch)
+    monkeypatch.setattr(bd, "BokaDirektClient", lambda **kwargs: client)
+    monkeypatch.setattr(bd.sys, "argv", ["bokadirekt_client.py", "--api-key", "KEY", "services", "Café"])
+    bd.main()
+    out = capsysbinary.readouterr().out
+    assert out.endswith(b"\n")
+    assert json.loads(out)["path"] == "/company/Café/services"
+    assert "Café".encode("utf-8") in out
+    assert b'\n  "method"' in out
+
+
+def test_main_raw_post_keeps_wide_integers(monkeypatch, tmp_path, capsysbinary):
+    client, fake = make_client(monkeypatch)
+    payload_path = tmp_path / "payload.json"
+    payload_path.write_text('{"ref": 123456789012345678901234567890}', encoding="utf-8")
+    monkeypatch.setattr(bd, "BokaDirektClient", lambda **kwargs: client)
+    monkeypatch.setattr(
+        bd.sys, "argv", ["bokadirekt_client.py", "--api-key", "KEY", "raw-post", "/custom", str(payload_path)]
+    )
+    bd.main()
+    assert fake.requests[-1][2] == {"ref": 123456789012345678901234567890}
+    out = capsysbinary.readouterr().out
+    assert json.loads(out)["json"] == {"ref": 123456789012345678901234567890}
+
+
+def test_handle_response_error_includes_parsed_body():
+    response = make_response({"error": "nope"}, status_code=500)
+    with pytest.raises(RuntimeError) as exc:
+        bd.BokaDirektClient._handle_response(response)
+    assert "(500)" in str(exc.value)
+    assert "nope" in str(exc.value)
+
+
+def test_handle_response_non_json_body_returns_raw():
+    response = SimpleNamespace(content=b"<html>", text="<html>", status_code=200)
+    assert bd.BokaDirektClient._handle_response(response) == {"raw": "<html>"}
+
+
+def test_check_availability_without_staff_omits_staff_id(monkeypatch):
+    client, fake = make_client(monkeypatch)
+    client.check_availability("123", "svc", from_date="2024-06-01", to_date="2024-06-02")
+    _, path, params = fake.requests[-1]
+    assert path == "/availability/123"
+    assert params == {"from": "2024-06-01", "to": "2024-06-02", "serviceId": "svc"}
+    client.close()
+
+
+def test_client_reuses_one_pooled_http2_client(monkeypatch):
+    created = []
+
+    def factory(*args, **kwargs):
+        created.append(kwargs)
+        fake = FakeClient()
+        fake.close = lambda: created.append("closed")
+        return fake
+
+    monkeypatch.setattr(bd.httpx, "Client", factory)
+    with bd.BokaDirektClient(api_key="KEY", base_url="https://example.com") as client:
+        client.list_services("1")
+        client.list_staff("1")
+    kwargs, closed = created
+    assert closed == "closed"
+    assert kwargs["http2"] is True
+    assert kwargs["headers"]["X-Api-Key"] == "KEY"
+    assert kwargs["timeout"].connect == bd.DEFAULT_CONNECT_TIMEOUT
+
+
+def test_async_check_availability_many_runs_concurrently(monkeypatch):
+    client, fake = make_async_client(monkeypatch)
+    in_flight = []
+    peak = []
+
+    async def slow_get(path, params=None):
+        in_flight.append(params["staffId"])
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        in_flight.remove(params["staffId"])
+        return make_response({"path": path, "staff": params["staffId"]})
+
+    fake.get = slow_get
+
+    async def run():
+        async with client:
+            return await client.check_availability_many(
+                "123",
+                "svc",
+                ["a", "b", "c"],
+                from_date="2024-06-01",
+                to_date="2024-06-02",
+            )
+
+    results = asyncio.run(run())
+    assert [result["staff"] for result in results] == ["a", "b", "c"]
+    assert max(peak) == 3
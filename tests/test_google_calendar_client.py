@@ -1,7 +1,11 @@
 # Aurora Polaris 2025. All rights reserved.
+import asyncio
 import json
+import threading
+from datetime import datetime, timedelta, timezone
 from types import SimpleNamespace
 
+import httpx
 import pytest
 
 import google_calendar_client as gcc
@@ -12,7 +16,6 @@ class FakeEventsResource:
         self.insert_called_with = None
         self.update_called_with = None
         self.delete_called_with = None
-        self.list_called_with = None
 
     def insert(self, calendarId, body):
         self.insert_called_with = {"calendarId": calendarId, "body": body}
@@ -26,31 +29,39 @@ class FakeEventsResource:
         self.delete_called_with = {"calendarId": calendarId, "eventId": eventId}
         return SimpleNamespace(execute=lambda: None)
 
-    def list(self, **kwargs):
-        self.list_called_with = kwargs
-        return SimpleNamespace(execute=lambda: {"items": [{"id": "evt", "start": {"dateTime": kwargs.get("timeMin")}}]})
 
 
-class FakeFreeBusyResource:
-    def __init__(self):
-        self.query_payload = None
+class FakeBatch:
+    def __init__(self, callback, sizes):
+        self._callback = callback
+        self._sizes = sizes
+        self._requests = []
+
+    def add(self, request, request_id):
+        self._requests.append((request_id, request))
 
-    def query(self, body):
-        self.query_payload = body
-        return SimpleNamespace(execute=lambda: {"calendars": {body["items"][0]["id"]: {"busy": []}}})
+    def execute(self):
+        self._sizes.append(len(self._requests))
+        for request_id, request in self._requests:
+            try:
+                response = request.execute()
+            except Exception as exc:
+                self._callback(request_id, None, exc)
+            else:
+                self._callback(request_id, response, None)
 
 
 class FakeService:
     def __init__(self):
         self.events_resource = FakeEventsResource()
-        self.freebusy_resource = FakeFreeBusyResource()
+        self.batch_sizes = []
+
+    def new_batch_http_request(self, callback):
+        return FakeBatch(callback, self.batch_sizes)
 
     def events(self):
         return self.events_resource
 
-    def freebusy(self):
-        return self.freebusy_resource
-
 
 @pytest.fixture
 def fake_service(monkeypatch):
@@ -59,26 +70,68 @@ def fake_service(monkeypatch):
     return service
 
 
-def test_create_event_calls_insert(fake_service):
+class FakeCredentials:
+    def __init__(self, token="TOKEN", expiry=None):
+        self.token = token
+        self.expiry = expiry
+        self.refreshes = 0
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.token = f"TOKEN-{self.refreshes}"
+        self.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(hours=1)
+
+
+@pytest.fixture
+def calendar_rest(monkeypatch):
+    calls = []
+
+    def handler(request):
+        body = json.loads(request.content) if request.content else None
+        calls.append({"method": request.method, "url": request.url, "body": body, "headers": request.headers})
+        if request.method == "DELETE":
+            return httpx.Response(204)
+        if request.url.path.endswith("/freeBusy"):
+            return httpx.Response(200, json={"calendars": {body["items"][0]["id"]: {"busy": []}}})
+        if request.method == "GET":
+            time_min = request.url.params.get("timeMin")
+            return httpx.Response(200, json={"items": [{"id": "evt", "start": {"dateTime": time_min}}]})
+        event_id = request.url.path.rsplit("/", 1)[-1] if request.method == "PUT" else "evt-123"
+        return httpx.Response(200, json={"id": event_id, "body": body})
+
+    rest = gcc._CalendarRest(FakeCredentials(), transport=httpx.MockTransport(handler))
+    rest.calls = calls
+    monkeypatch.setattr(gcc, "_get_calendar_rest", lambda credentials_path=None: rest)
+    yield rest
+    rest.close()
+
+
+def test_create_event_calls_insert(calendar_rest):
     body = {"summary": "Test"}
     result = gcc.create_event("primary", body)
     assert result["id"] == "evt-123"
-    assert fake_service.events_resource.insert_called_with["body"] == body
+    call = calendar_rest.calls[-1]
+    assert call["method"] == "POST"
+    assert call["url"].path == "/calendar/v3/calendars/primary/events"
+    assert call["body"] == body
+    assert call["headers"]["Authorization"] == "Bearer TOKEN"
 
 
-def test_update_event_calls_update(fake_service):
+def test_update_event_calls_update(calendar_rest):
     body = {"summary": "Updated"}
     result = gcc.update_event("primary", "evt-123", body)
     assert result["id"] == "evt-123"
-    assert fake_service.events_resource.update_called_with["eventId"] == "evt-123"
+    assert calendar_rest.calls[-1]["method"] == "PUT"
 
 
-def test_delete_event_calls_delete(fake_service):
-    gcc.delete_event("primary", "evt-123")
-    assert fake_service.events_resource.delete_called_with == {"calendarId": "primary", "eventId": "evt-123"}
+def test_delete_event_calls_delete(calendar_rest):
+    assert gcc.delete_event("user@example.com", "evt-123") is None
+    call = calendar_rest.calls[-1]
+    assert call["method"] == "DELETE"
+    assert call["url"].raw_path == b"/calendar/v3/calendars/user%40example.com/events/evt-123"
 
 
-def test_list_events_with_time_bounds(fake_service):
+def test_list_events_with_time_bounds(calendar_rest):
     events = list(
         gcc.list_events(
             "primary",
@@ -87,23 +140,47 @@ def test_list_events_with_time_bounds(fake_service):
             max_results=5,
         )
     )
-    called = fake_service.events_resource.list_called_with
-    assert called["maxResults"] == 5
-    assert called["timeMin"].endswith("Z")
+    params = calendar_rest.calls[-1]["url"].params
+    assert params["maxResults"] == "5"
+    assert params["singleEvents"] == "true"
+    assert params["timeMin"].endswith("Z")
     assert events[0]["id"] == "evt"
 
 
-def test_check_availability(fake_service):
+def test_check_availability(calendar_rest):
     availability = gcc.check_availability(
         "primary",
         start="2024-06-01T10:00:00+00:00",
         end="2024-06-01T11:00:00+00:00",
     )
-    payload = fake_service.freebusy_resource.query_payload
+    payload = calendar_rest.calls[-1]["body"]
     assert payload["timeMin"].endswith("Z")
     assert availability == {"busy": []}
 
 
+def test_calendar_rest_refreshes_token_near_expiry():
+    creds = FakeCredentials(expiry=datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(minutes=1))
+    rest = gcc._CalendarRest(creds, transport=httpx.MockTransport(lambda request: httpx.Response(200)))
+    assert rest.access_token() == "TOKEN-1"
+    assert rest.access_token() == "TOKEN-1"
+    assert creds.refreshes == 1
+    rest.close()
+
+
+def test_calendar_rest_error_keeps_google_body_and_long_timeout():
+    error = {"error": {"code": 404, "message": "Not Found"}}
+    rest = gcc._CalendarRest(
+        FakeCredentials(),
+        transport=httpx.MockTransport(lambda request: httpx.Response(404, json=error)),
+    )
+    assert rest._client.timeout.read == 60.0
+    with pytest.raises(gcc.HttpError, match="Not Found") as excinfo:
+        rest.insert_event("primary", {"summary": "Test"})
+    assert excinfo.value.status_code == 404
+    assert json.loads(excinfo.value.content) == error
+    rest.close()
+
+
 def test_ensure_rfc3339_requires_timezone():
     with pytest.raises(ValueError):
         gcc._ensure_rfc3339("2024-06-01T10:00:00")
@@ -112,3 +189,170 @@ def test_ensure_rfc3339_requires_timezone():
 def test_ensure_rfc3339_allows_zulu():
     value = gcc._ensure_rfc3339("2024-06-01T10:00:00Z")
     assert value.endswith("Z")
+
+
+def test_get_calendar_service_is_cached_per_credentials_file(monkeypatch, tmp_path):
+    credentials = tmp_path / "creds.json"
+    credentials.write_text("{}", encoding="utf-8")
+    built = []
+
+    monkeypatch.setattr(
+        gcc.service_account.Credentials,
+        "from_service_account_file",
+        lambda path, scopes: SimpleNamespace(path=path),
+    )
+
+    def fake_build(*args, **kwargs):
+        built.append(kwargs)
+        return object()
+
+    monkeypatch.setattr(gcc, "build", fake_build)
+    monkeypatch.setattr(gcc, "_thread_services", threading.local())
+    first = gcc.get_calendar_service(str(credentials))
+    second = gcc.get_calendar_service(str(credentials))
+
+    other = []
+    worker = threading.Thread(target=lambda: other.append(gcc.get_calendar_service(str(credentials))))
+    worker.start()
+    worker.join()
+
+    assert first is second
+    assert other[0] is not first
+    assert len(built) == 2
+    assert built[0]["static_discovery"] is True
+
+
+def test_create_events_batch_chunks_requests(fake_service):
+    bodies = [{"summary": f"Event {index}"} for index in range(120)]
+    results = gcc.create_events_batch("primary", bodies)
+    assert fake_service.batch_sizes == [50, 50, 20]
+    assert [result["body"] for result in results] == bodies
+
+
+def test_update_and_delete_events_batch(fake_service):
+    results = gcc.update_events_batch("primary", [("evt-1", {"summary": "A"}), ("evt-2", {"summary": "B"})])
+    assert [result["id"] for result in results] == ["evt-1", "evt-2"]
+    gcc.delete_events_batch("primary", ["evt-1", "evt-2"])
+    assert fake_service.events_resource.delete_called_with == {"calendarId": "primary", "eventId": "evt-2"}
+    assert fake_service.batch_sizes == [2, 2]
+
+
+def test_events_batch_raises_first_error(fake_service):
+    def failing_insert(calendarId, body):
+        def execute():
+            raise RuntimeError(f"failed {body['summary']}")
+
+        return SimpleNamespace(execute=execute)
+
+    fake_service.events_resource.insert = failing_insert
+    with pytest.raises(RuntimeError, match="failed A"):
+        gcc.create_events_batch("primary", [{"summary": "A"}] + [{"summary": "B"}] * 60)
+    assert fake_service.batch_sizes == [50]
+
+
+class FakeFreeBusyClient:
+    def __init__(self, *args, **kwargs):
+        self.headers = kwargs.get("headers")
+        self.bodies = []
+        FakeFreeBusyClient.instance = self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+        return False
+
+    async def post(self, url, json):
+        self.bodies.append(json)
+        calendars = {item["id"]: {"busy": [item["id"]]} for item in json["items"]}
+        return httpx.Response(200, json={"calendars": calendars}, request=httpx.Request("POST", url))
+
+
+def test_check_availability_many_fans_out(monkeypatch):
+    async def fake_token(credentials_path):
+        return "TOKEN"
+
+    monkeypatch.setattr(gcc, "_fetch_access_token", fake_token)
+    monkeypatch.setattr(gcc.httpx, "AsyncClient", FakeFreeBusyClient)
+
+    calendar_ids = [f"cal-{index}" for index in range(60)]
+    result = asyncio.run(
+        gcc.check_availability_many(calendar_ids, "2024-06-01T10:00:00+00:00", "2024-06-01T11:00:00Z")
+    )
+
+    client = FakeFreeBusyClient.instance
+    assert client.headers == {"Authorization": "Bearer TOKEN"}
+    assert [len(body["items"]) for body in client.bodies] == [50, 10]
+    assert client.bodies[0]["timeMin"].endswith("Z")
+    assert list(result) == calendar_ids
+    assert result["cal-59"] == {"busy": ["cal-59"]}
+
+
+def test_check_availability_many_empty_skips_token(monkeypatch):
+    async def fail_token(credentials_path):
+        raise AssertionError("no token needed")
+
+    monkeypatch.setattr(gcc, "_fetch_access_token", fail_token)
+    assert asyncio.run(gcc.check_availability_many([], "2024-06-01T10:00:00Z", "2024-06-01T11:00:00Z")) == {}
+
+
+def test_check_availability_many_error_keeps_body_and_cancels_siblings(monkeypatch):
+    error = {"error": {"code": 403, "message": "Forbidden calendar"}}
+    cancelled = []
+
+    class FailingFreeBusyClient(FakeFreeBusyClient):
+        async def post(self, url, json):
+            if json["items"][0]["id"] == "cal-0":
+                return httpx.Response(403, json=error, request=httpx.Request("POST", url))
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(getattr(self, "closed", False))
+                raise
+
+    async def fake_token(credentials_path):
+        return "TOKEN"
+
+    monkeypatch.setattr(gcc, "_fetch_access_token", fake_token)
+    monkeypatch.setattr(gcc.httpx, "AsyncClient", FailingFreeBusyClient)
+
+    calendar_ids = [f"cal-{index}" for index in range(60)]
+    with pytest.raises(gcc.HttpError, match="Forbidden calendar"):
+        asyncio.run(gcc.check_availability_many(calendar_ids, "2024-06-01T10:00:00Z", "2024-06-01T11:00:00Z"))
+    assert cancelled == [False]
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("2024-06-01T10:00:00Z", "2024-06-01T10:00:00Z"),
+        ("2024-06-01T10:00:00+00:00", "2024-06-01T10:00:00Z"),
+        ("2024-06-01T10:00:00.250Z", "2024-06-01T10:00:00.250Z"),
+        ("2024-06-01T10:00:00+02:00", "2024-06-01T10:00:00+02:00"),
+        ("2024-02-29T23:59:59Z", "2024-02-29T23:59:59Z"),
+    ],
+)
+def test_ensure_rfc3339_normalizes(value, expected):
+    assert gcc._ensure_rfc3339(value) == expected
+
+
+@pytest.mark.parametrize("value", ["2023-02-29T10:00:00Z", "2024-13-01T10:00:00Z", "2024-06-01T24:00:00Z"])
+def test_ensure_rfc3339_rejects_invalid_dates(value):
+    with pytest.raises(ValueError):
+        gcc._ensure_rfc3339(value)
+
+
+def test_ensure_rfc3339_keeps_canonical_offsets_without_parsing(monkeypatch):
+    monkeypatch.setattr(gcc, "_ensure_rfc3339_slow", lambda value: pytest.fail("slow path used"))
+    assert gcc._ensure_rfc3339("2024-06-01T10:00:00.5-05:30") == "2024-06-01T10:00:00.5-05:30"
+    assert gcc._ensure_rfc3339("2024-06-01T10:00:00-00:00") == "2024-06-01T10:00:00Z"
+
+
+def test_load_event_from_json(tmp_path):
+    path = tmp_path / "event.json"
+    event = {"summary": "Möte", "extendedProperties": {"private": {"ref": 123456789012345678901234567890}}}
+    path.write_text(json.dumps(event), encoding="utf-8")
+    assert gcc._load_event_from_json(str(path)) == event
+    with pytest.raises(FileNotFoundError, match="Event JSON file not found"):
+        gcc._load_event_from_json(str(tmp_path / "missing.json"))
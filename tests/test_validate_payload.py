@@ -75,3 +75,92 @@ def test_is_empty_whitespace_string():
 
 def test_is_empty_nonempty_collection():
     assert vp.is_empty([1]) is False
+
+
+def test_validate_payload_uses_precomputed_required_set():
+    payload = {"Service": "Cut", "Extra": 1}
+    required = ("Service",)
+    _, _, extras = vp.validate_payload(payload, required, False, required_set=frozenset(required))
+    assert extras == ["Extra"]
+
+
+def test_validate_payload_fast_matches_validate_payload():
+    payload = {"Service": "Cut", "Phone": " ", "Zeta": 1, "Alpha": 2}
+    required = ("Service", "Phone", "Date")
+    expected = vp.validate_payload(payload, list(required), allow_empty=False)
+    assert vp.validate_payload_fast(payload, required, frozenset(required), False) == expected
+    assert expected == (["Date"], ["Phone"], ["Zeta", "Alpha"])
+
+
+def test_validate_payload_sort_extras():
+    payload = {"Zeta": 1, "Service": "Cut", "Alpha": 2}
+    _, _, extras = vp.validate_payload(payload, ["Service"], False, sort_extras=True)
+    assert extras == ["Alpha", "Zeta"]
+
+
+class _Tag(str):
+    pass
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (None, True),
+        ("", True),
+        ("\t\n", True),
+        (" x ", False),
+        ({}, True),
+        ((), True),
+        (set(), True),
+        (0, False),
+        (False, False),
+        (_Tag("  "), True),
+        (_Tag("x"), False),
+    ],
+)
+def test_is_empty_by_type(value, expected):
+    assert vp.is_empty(value) is expected
+
+
+def test_validate_payloads_bulk():
+    payloads = [{"Service": "Cut", "Phone": "1"}, {"Service": ""}, {"Other": 1}]
+    results = vp.validate_payloads_bulk(payloads, ["Service", "Phone"])
+    assert results == [
+        ([], [], []),
+        (["Phone"], ["Service"], []),
+        (["Service", "Phone"], [], ["Other"]),
+    ]
+
+
+def test_load_payload_reads_json_object(tmp_path):
+    path = write_temp(tmp_path, "payload.json", json.dumps({"Service": "Klippning å"}))
+    assert vp.load_payload(path) == {"Service": "Klippning å"}
+
+
+def test_load_payload_invalid_json_exits(tmp_path):
+    path = write_temp(tmp_path, "payload.json", "{nope")
+    with pytest.raises(SystemExit) as exc:
+        vp.load_payload(path)
+    assert "invalid JSON" in str(exc.value)
+
+
+def test_parse_fields_file_large_newlines_uses_mmap(tmp_path):
+    names = [f"field_{index:05d}" for index in range(600)]
+    path = write_temp(tmp_path, "fields.txt", "\n\n".join(names) + "\n  \n")
+    assert path.stat().st_size >= vp._MMAP_THRESHOLD
+    assert vp.parse_fields_file(path) == names
+
+
+def test_parse_fields_file_large_json(tmp_path):
+    names = [f"field_{index:05d}" for index in range(600)]
+    path = write_temp(tmp_path, "fields.json", json.dumps({"fields": names}))
+    assert vp.parse_fields_file(path) == names
+
+
+def test_parse_args_reuses_cached_parser(monkeypatch):
+    assert vp._build_parser() is vp._build_parser()
+    monkeypatch.setattr(vp.sys, "argv", ["validate_payload.py", "payload.json", "-r", "Custom", "--allow-empty"])
+    args = vp.parse_args()
+    assert args.payload == Path("payload.json")
+    assert args.required == ["Custom"]
+    assert args.allow_empty is True
@@ -4,10 +4,18 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import mmap
 import sys
 from pathlib import Path
-from typing import Any, List, Sequence, Tuple
+from typing import AbstractSet, Any, Iterable, List, Sequence, Tuple
+
+try:
+    # orjson is optional; its JSONDecodeError subclasses json.JSONDecodeError.
+    from orjson import loads as _loads
+except ImportError:  # pragma: no cover
+    _loads = json.loads
 
 DEFAULT_REQUIRED_FIELDS = [
     "Service",
@@ -18,8 +26,16 @@ DEFAULT_REQUIRED_FIELDS = [
     "Time",
     "action",
 ]
+_DEFAULT_REQUIRED_SET = frozenset(DEFAULT_REQUIRED_FIELDS)
+# Below this size, mmap setup costs more than reading the file directly.
+_MMAP_THRESHOLD = 4096
 
 def parse_args() -> argparse.Namespace:
+    return _build_parser().parse_args()
+
+
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Validate that a payload JSON includes required dynamic variables.",
     )
@@ -54,18 +70,18 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Allow required fields to be empty or null.",
     )
-    return parser.parse_args()
+    return parser
 
 def load_payload(path: Path) -> dict[str, Any]:
     try:
-        text = path.read_text(encoding="utf-8")
+        raw = path.read_bytes()
     except FileNotFoundError:
         raise SystemExit(f"error: payload file '{path}' not found.")
     except OSError as exc:
         raise SystemExit(f"error: could not read payload file '{path}': {exc}") from exc
 
     try:
-        data = json.loads(text)
+        data = _loads(raw)
     except json.JSONDecodeError as exc:
         raise SystemExit(f"error: invalid JSON in '{path}': {exc}") from exc
 
@@ -90,17 +106,12 @@ def load_required_fields(args: argparse.Namespace) -> List[str]:
         fields.extend(DEFAULT_REQUIRED_FIELDS)
 
     # Preserve ordering while removing duplicates.
-    seen = set()
-    ordered_fields = []
-    for field in fields:
-        if field in seen:
-            continue
-        seen.add(field)
-        ordered_fields.append(field)
-    return ordered_fields
+    return list(dict.fromkeys(fields))
 
 def parse_fields_file(path: Path) -> List[str]:
     try:
+        if path.stat().st_size >= _MMAP_THRESHOLD:
+            return _parse_mapped_fields_file(path)
         text = path.read_text(encoding="utf-8").strip()
     except FileNotFoundError:
         raise SystemExit(f"error: field list file '{path}' not found.")
@@ -111,28 +122,71 @@ def parse_fields_file(path: Path) -> List[str]:
         raise SystemExit(f"error: field list file '{path}' is empty.")
 
     try:
-        data = json.loads(text)
+        data = _loads(text)
     except json.JSONDecodeError:
         return [line for line in (line.strip() for line in text.splitlines()) if line]
-    else:
-        if isinstance(data, list):
-            values = data
-        elif isinstance(data, dict) and "fields" in data and isinstance(data["fields"], list):
-            values = data["fields"]
+    return _fields_from_json(path, data)
+
+
+def _parse_mapped_fields_file(path: Path) -> List[str]:
+    """Read a large field list through mmap instead of one big decoded string."""
+    with path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        try:
+            data = _loads(mapped[:])
+        except json.JSONDecodeError:
+            pass
         else:
-            raise SystemExit(
-                f"error: field list file '{path}' must be a JSON array or newline separated text.",
-            )
-        cleaned = [str(item).strip() for item in values if str(item).strip()]
-        if not cleaned:
-            raise SystemExit(f"error: field list file '{path}' does not contain any usable field names.")
-        return cleaned
+            return _fields_from_json(path, data)
+
+        lines = [line.decode("utf-8").strip() for line in iter(mapped.readline, b"") if line.strip()]
+    if not lines:
+        raise SystemExit(f"error: field list file '{path}' is empty.")
+    return lines
+
+
+def _fields_from_json(path: Path, data: Any) -> List[str]:
+    if isinstance(data, list):
+        values = data
+    elif isinstance(data, dict) and "fields" in data and isinstance(data["fields"], list):
+        values = data["fields"]
+    else:
+        raise SystemExit(
+            f"error: field list file '{path}' must be a JSON array or newline separated text.",
+        )
+    cleaned = [str(item).strip() for item in values if str(item).strip()]
+    if not cleaned:
+        raise SystemExit(f"error: field list file '{path}' does not contain any usable field names.")
+    return cleaned
 
 def validate_payload(
     payload: dict[str, Any],
     required_fields: Sequence[str],
     allow_empty: bool,
+    required_set: AbstractSet[str] | None = None,
+    sort_extras: bool = False,
 ) -> Tuple[List[str], List[str], List[str]]:
+    """Check ``payload`` against ``required_fields``.
+
+    ``required_set`` may carry a precomputed set of ``required_fields`` so hot
+    callers avoid rebuilding it on every call. Extras are reported in payload
+    order unless ``sort_extras`` is set.
+    """
+    if required_set is None:
+        if required_fields is DEFAULT_REQUIRED_FIELDS:
+            required_set = _DEFAULT_REQUIRED_SET
+        else:
+            required_set = frozenset(required_fields)
+    return validate_payload_fast(payload, required_fields, required_set, allow_empty, sort_extras=sort_extras)
+
+
+def validate_payload_fast(
+    payload: dict[str, Any],
+    required_fields: Sequence[str],
+    required_set: AbstractSet[str],
+    allow_empty: bool,
+    sort_extras: bool = False,
+) -> Tuple[List[str], List[str], List[str]]:
+    """Variant of :func:`validate_payload` for callers that precompute ``required_set``."""
     missing: List[str] = []
     empty: List[str] = []
     for field in required_fields:
@@ -144,15 +198,40 @@ def validate_payload(
         if is_empty(payload[field]):
             empty.append(field)
 
-    extras = sorted(set(payload) - set(required_fields))
+    extras = [key for key in payload if key not in required_set]
+    if sort_extras:
+        extras.sort()
     return missing, empty, extras
 
 
+def validate_payloads_bulk(
+    payloads: Iterable[dict[str, Any]],
+    required_fields: Sequence[str],
+    allow_empty: bool = False,
+) -> List[Tuple[List[str], List[str], List[str]]]:
+    """Validate many payloads against one required-field list.
+
+    The required-field tuple and set are built once for the whole batch
+    rather than once per payload.
+    """
+    required = tuple(required_fields)
+    required_set = frozenset(required)
+    return [validate_payload_fast(payload, required, required_set, allow_empty) for payload in payloads]
+
+
 def is_empty(value: Any) -> bool:
     if value is None:
         return True
+    # Exact type checks cover decoded JSON; isinstance only runs for subclasses.
+    value_type = type(value)
+    if value_type is str:
+        return not value or value.isspace()
+    if value_type is dict or value_type is list or value_type is tuple or value_type is set:
+        return not value
+    if value_type is int or value_type is float or value_type is bool:
+        return False
     if isinstance(value, str):
-        return value.strip() == ""
+        return not value or value.isspace()
     if isinstance(value, (list, tuple, set, dict)):
         return len(value) == 0
     return False
@@ -163,7 +242,7 @@ def main() -> None:
     required_fields = load_required_fields(args)
     payload = load_payload(args.payload)
 
-    missing, empty, extras = validate_payload(payload, required_fields, args.allow_empty)
+    missing, empty, extras = validate_payload(payload, required_fields, args.allow_empty, sort_extras=True)
 
     if missing or empty:
         if missing: